@@ -0,0 +1,3 @@
+metadata(description="Register access helper for I2C device drivers.", version="0.1.0")
+
+module("regbank.py", opt=3)
@@ -0,0 +1,57 @@
+# Register access helper for I2C device drivers
+#
+# Drivers derive from RegBank to share the register access methods.
+# All accesses go through pre-allocated buffers, so reading or writing
+# a register does not allocate memory.
+# The methods add a call frame per access: code that polls the device
+# should call self.i2c directly, as TSL2591.get_measure_results() does.
+#
+# Example usage:
+# @code{.py}
+#    from regbank import RegBank
+#
+#    class Sensor(RegBank):
+#        CONFIG = 0x01
+#
+#        def __init__(self, i2c, addr=0x29):
+#            super().__init__(i2c, addr)
+#            self.write_u8(self.CONFIG, self.read_u8(self.CONFIG) | 0x01)
+# @endcode
+#
+
+
+class RegBank:
+    # Init register bank
+    # @param i2c  I2C interface
+    # @param addr I2C addr
+    def __init__(self, i2c, addr):
+        self.i2c = i2c
+        self.i2c_addr = addr
+        self._b1 = bytearray(1)
+
+    # Read 8 bit register
+    # @param reg register address
+    # @return register value as int
+    def read_u8(self, reg):
+        buf = self._b1
+        self.i2c.readfrom_mem_into(self.i2c_addr, reg, buf)
+        return buf[0]
+
+    # Write 8 bit register
+    # @param reg  register address
+    # @param data register value
+    def write_u8(self, reg, data):
+        buf = self._b1
+        buf[0] = data
+        self.i2c.writeto_mem(self.i2c_addr, reg, buf)
+
+    # Read consecutive registers
+    # @param reg start register address
+    # @param buf buffer to read into, its length is the number of bytes
+    def read_burst(self, reg, buf):
+        self.i2c.readfrom_mem_into(self.i2c_addr, reg, buf)
+
+    # Write a command to devices without register addressing
+    # @param data command bytes
+    def write(self, data):
+        self.i2c.writeto(self.i2c_addr, data)
@@ -18,25 +18,67 @@
 #
 
 from machine import I2C
+from regbank import RegBank
 import time
 
+# Commands
+_AHT_CMD_TRIGGER = b"\x70\xac\x33\x00"
+_AHT_CMD_STATUS = b"\x71"
+# Result while the measurement is still running, shared to avoid an allocation per poll
+_NONE_TUPLE = (None,) * 5
 
-class AHT:
+
+# Lookup table for CRC-8 (polynomial 0x31)
+_CRC8_TABLE = (
+    b"\x00\x31\x62\x53\xc4\xf5\xa6\x97\xb9\x88\xdb\xea\x7d\x4c\x1f\x2e"
+    b"\x43\x72\x21\x10\x87\xb6\xe5\xd4\xfa\xcb\x98\xa9\x3e\x0f\x5c\x6d"
+    b"\x86\xb7\xe4\xd5\x42\x73\x20\x11\x3f\x0e\x5d\x6c\xfb\xca\x99\xa8"
+    b"\xc5\xf4\xa7\x96\x01\x30\x63\x52\x7c\x4d\x1e\x2f\xb8\x89\xda\xeb"
+    b"\x3d\x0c\x5f\x6e\xf9\xc8\x9b\xaa\x84\xb5\xe6\xd7\x40\x71\x22\x13"
+    b"\x7e\x4f\x1c\x2d\xba\x8b\xd8\xe9\xc7\xf6\xa5\x94\x03\x32\x61\x50"
+    b"\xbb\x8a\xd9\xe8\x7f\x4e\x1d\x2c\x02\x33\x60\x51\xc6\xf7\xa4\x95"
+    b"\xf8\xc9\x9a\xab\x3c\x0d\x5e\x6f\x41\x70\x23\x12\x85\xb4\xe7\xd6"
+    b"\x7a\x4b\x18\x29\xbe\x8f\xdc\xed\xc3\xf2\xa1\x90\x07\x36\x65\x54"
+    b"\x39\x08\x5b\x6a\xfd\xcc\x9f\xae\x80\xb1\xe2\xd3\x44\x75\x26\x17"
+    b"\xfc\xcd\x9e\xaf\x38\x09\x5a\x6b\x45\x74\x27\x16\x81\xb0\xe3\xd2"
+    b"\xbf\x8e\xdd\xec\x7b\x4a\x19\x28\x06\x37\x64\x55\xc2\xf3\xa0\x91"
+    b"\x47\x76\x25\x14\x83\xb2\xe1\xd0\xfe\xcf\x9c\xad\x3a\x0b\x58\x69"
+    b"\x04\x35\x66\x57\xc0\xf1\xa2\x93\xbd\x8c\xdf\xee\x79\x48\x1b\x2a"
+    b"\xc1\xf0\xa3\x92\x05\x34\x67\x56\x78\x49\x1a\x2b\xbc\x8d\xde\xef"
+    b"\x82\xb3\xe0\xd1\x46\x77\x24\x15\x3b\x0a\x59\x68\xff\xce\x9d\xac"
+)
+
+
+# Conversion of the 20 bit raw values to hundredths of °C / %RH
+# @details
+#   T = 200 * t_raw / 2^20 - 50 and RH = 100 * h_raw / 2^20. The divisor is a
+#   power of two, so the nearest integer is obtained by adding half of it and
+#   shifting, without any division or floating point operation.
+def _t_centi(t_raw):
+    return ((t_raw * 20000 + (1 << 19)) >> 20) - 5000
+
+
+def _h_centi(h_raw):
+    return (h_raw * 10000 + (1 << 19)) >> 20
+
+
+class AHT(RegBank):
 
     # Init AHT
     # @param i2c  I2C interface
     # @param addr I2C addr (default = 0x38)
     def __init__(self, i2c, addr=0x38):
-        self.i2c = i2c
-        self.i2c_addr = addr
+        super().__init__(i2c, addr)
+        # Receive buffer for status, humidity, temperature and crc
+        self._buf = bytearray(7)
+        # crc covers status, humidity and temperature
+        self._mv = memoryview(self._buf)[:6]
         # Datasheet:
         # Before reading the temperature and humidity value, get a byte of status
-        # word by sending 0x71. If the status word and 0x18 are not equal to 0x18, 
+        # word by sending 0x71. If the status word and 0x18 are not equal to 0x18,
         # initialize the 0x1B, 0x1C, 0x1E registers
-        self.i2c.writeto(self.i2c_addr, b"\x71")
-        status = self.i2c.readfrom(self.i2c_addr, 1)
         # TODO?
-        # no detailed description found
+        # no detailed description found, so the status is not read here
         # Reference: demo code from aosong
         # if (status[0] & 0x18) != 0x18:
         #     JH_Reset_REG(0x1b);
@@ -50,21 +92,36 @@ class AHT:
     #     0 = crc does not match
     #     1 = crc ok
     def _check_crc(self, data, checksum):
+        # CRC-8 (polynomial 0x31, init 0xFF), one table lookup per byte
         crc = 0xFF
+        table = _CRC8_TABLE
         for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x80:
-                    crc = (crc << 1) ^ 0x31
-                else:
-                    crc = crc << 1
-        crc = crc & 0xFF
+            crc = table[crc ^ byte]
         return checksum == crc
 
     # Start measurement
     # @return None
     def start_measure(self):
-        self.i2c.writeto(self.i2c_addr, b"\x70\xac\x33\x00")
+        self.write(_AHT_CMD_TRIGGER)
+
+    # Read the raw measurement values
+    # @return None if the measurement is still running, otherwise
+    #   temperature[raw], humidity[raw], valid
+    def _get_raw_results(self):
+        # The status byte is the first byte of the response, so status and
+        # data are read together. While busy the data bytes are discarded.
+        i2c = self.i2c
+        i2c.writeto(self.i2c_addr, _AHT_CMD_STATUS)
+        response = self._buf
+        i2c.readfrom_into(self.i2c_addr, response)
+        if response[0] & 0x80:
+            # measurement still running: skip decoding and crc
+            return None
+        # 20 bit values, byte 3 is shared: humidity high nibble, temperature low nibble
+        h_raw = (response[1] << 12) | (response[2] << 4) | (response[3] >> 4)
+        t_raw = ((response[3] & 0x0F) << 16) | (response[4] << 8) | response[5]
+        isvalid = self._check_crc(self._mv, response[6])
+        return t_raw, h_raw, isvalid
 
     # Get the measurement values
     # @details
@@ -73,20 +130,19 @@ class AHT:
     #   and needs to be restarted again for a new measurement.
     # @return temperature[raw], temperature[°C], humidity[raw], humidity[%RH], valid
     def get_measure_results(self):
-        self.i2c.writeto(self.i2c_addr, b"\x71")
-        status = self.i2c.readfrom(self.i2c_addr, 1)
-        if status[0] & 0x80:
-            # measurement still running
-            return None, None, None, None, None
-        else:
-            self.i2c.writeto(self.i2c_addr, b"\x71")
-            response = self.i2c.readfrom(self.i2c_addr, 7)
-            h_bytes = response[1:4]
-            h_raw = int.from_bytes(h_bytes, "big") >> 4
-            h_val = (100 * h_raw) / 0x100000
-            t_bytes = response[3:6]
-            t_raw = int.from_bytes(t_bytes, "big") & 0xFFFFF
-            t_val = (200 * t_raw) / 0x100000 - 50
-            isvalid = self._check_crc(response[0:6], response[6])
-            return t_raw, round(t_val, 2), h_raw, round(h_val, 2), bool(isvalid)
+        results = self._get_raw_results()
+        if results is None:
+            return _NONE_TUPLE
+        t_raw, h_raw, isvalid = results
+        t_val = round(_t_centi(t_raw) * 0.01, 2)
+        h_val = round(_h_centi(h_raw) * 0.01, 2)
+        return t_raw, t_val, h_raw, h_val, bool(isvalid)
 
+    # Get the measurement values as integers
+    # @return temperature[raw], temperature[0.01 °C], humidity[raw], humidity[0.01 %RH], valid
+    def get_measure_results_int(self):
+        results = self._get_raw_results()
+        if results is None:
+            return _NONE_TUPLE
+        t_raw, h_raw, isvalid = results
+        return t_raw, _t_centi(t_raw), h_raw, _h_centi(h_raw), bool(isvalid)
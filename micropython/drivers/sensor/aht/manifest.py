@@ -1,3 +1,4 @@
-metadata(description="AHT20/DHT20 temperature/humidity sensor driver.", version="0.1.0")
+metadata(description="AHT20/DHT20 temperature/humidity sensor driver.", version="0.2.1")
 
+require("regbank")
 module("aht.py", opt=3)
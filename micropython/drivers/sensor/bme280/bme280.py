@@ -18,66 +18,166 @@
 #
 
 from machine import Pin, I2C
+from regbank import RegBank
+import struct
 import time
 
+# Constant offset of the pressure compensation, computed once at import
+_ONE_SHIFT_47 = 1 << 47
+# Reciprocal scaling factors, to multiply instead of divide per measurement
+_INV100 = 0.01
+_INV1024 = 1 / 1024
+_INV25600 = 1 / 25600
+# Result while the measurement is still running, shared to avoid an allocation per poll
+_NONE_TUPLE = (None,) * 6
 
-class BME280:
-    # Init SHT
+
+# Temperature compensation (BME280 datasheet chapter 4.2.3)
+# @return t_fine (temperature in °C * 5120)
+def _comp_T(t_raw, calib):
+    T1, T1x2, T2, T3 = calib
+    var1 = (((t_raw >> 3) - T1x2) * T2) >> 11
+    # var2 = (((((t_raw >> 4) - T1) * ((t_raw >> 4) - T1)) >> 12) * T3) >> 14
+    var2 = (((((t_raw >> 4) - T1) ** 2) >> 12) * T3) >> 14
+    return var1 + var2
+
+
+# Humidity compensation
+# @return humidity in %RH as Q22.10 or None if out of range
+def _comp_H(h_raw, t_fine, calib):
+    H1, H2, H3, H4x20, H5, H6 = calib
+    var1 = t_fine - 76800
+    var1 = ((((h_raw << 14) - H4x20 - (H5 * var1)) + 16384) >> 15) * (
+        (((((((var1 * H6) >> 10) * (((var1 * H3) >> 11) + 32768)) >> 10) + 2097152) * H2) + 8192)
+        >> 14
+    )
+    # var1 = (var1 - (((((var1 >> 15) * (var1 >> 15)) >> 7) * H1) >> 4))
+    var1 = var1 - (((((var1 >> 15) ** 2) >> 7) * H1) >> 4)
+    if var1 < 0 or var1 > 419430400:
+        return None
+    return var1 >> 12
+
+
+# Pressure compensation
+# @return pressure in Pa as Q24.8 or None if the calibration is invalid
+def _comp_P(p_raw, t_fine, calib):
+    P1, P2, P3, P4x35, P5, P6, P7x4, P8, P9 = calib
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + P4x35
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (_ONE_SHIFT_47 + var1) * P1 >> 33
+    if var1 == 0:
+        return None
+    p_int = 1048576 - p_raw
+    p_int = (((p_int << 31) - var2) * 3125) // var1
+    var1 = (P9 * (p_int >> 13) * (p_int >> 13)) >> 25
+    var2 = (P8 * p_int) >> 19
+    return ((p_int + var1 + var2) >> 8) + P7x4
+
+
+class BME280(RegBank):
+    # Register
+    CALIB00 = 0x88
+    CALIB26 = 0xE1
+    CTRL_HUM = 0xF2
+    STATUS = 0xF3
+    CTRL_MEAS = 0xF4
+    CONFIG = 0xF5
+    PRESS = 0xF7
+
+    # Init BME280
     # @param i2c  I2C interface
     # @param addr I2C addr (default = 0x76)
     def __init__(self, i2c, addr=0x76):
-        self.i2c = i2c
-        self.i2c_addr = addr
+        super().__init__(i2c, addr)
+        # Buffer for the burst read of the measurement registers 0xF7..0xFE
+        self._buf = bytearray(8)
         # Settings:
         # Sensor mode = forced mode
         # Oversampling settings = pressure * 1, temperature * 1, humidity * 1
         # IIR filter settings = filter off
-        self._write(0xF4, 0x24)
-        self._write(0xF2, 0x01)
-        self._write(0xF5, 0x00)
+        self.write_u8(self.CTRL_MEAS, 0x24)
+        self.write_u8(self.CTRL_HUM, 0x01)
+        self.write_u8(self.CONFIG, 0x00)
         self._get_compensation_params()
 
-    # Read data from register
-    # @param addr register address
-    # @param len  number of bytes (default: 1)
-    # @return register value as int
-    def _read(self, addr, len=1, byteorder="big"):
-        bytes = self.i2c.readfrom_mem(self.i2c_addr, addr, len)
-        return int.from_bytes(bytes, byteorder)
-
-    # Write data into register
-    # @param addr register address
-    # @param data register value
-    def _write(self, addr, data):
-        self.i2c.writeto_mem(self.i2c_addr, addr, bytes([int(data)]))
-
+    # Read the factory calibration data
+    # @details
+    #   The calibration words are stored in two contiguous blocks
+    #   (0x88..0xA1 and 0xE1..0xE7) which are fetched with one burst read each.
     def _get_compensation_params(self):
-        l = "little"
-        self.dig_T1 = self._read(0x88, 2, l)
-        self.dig_T2 = self._read(0x8A, 2, l)
-        self.dig_T3 = self._read(0x8C, 2, l)
-        self.dig_P1 = self._read(0x8E, 2, l)
-        self.dig_P2 = self._read(0x90, 2, l)
-        self.dig_P3 = self._read(0x92, 2, l)
-        self.dig_P4 = self._read(0x94, 2, l)
-        self.dig_P5 = self._read(0x96, 2, l)
-        self.dig_P6 = self._read(0x98, 2, l)
-        self.dig_P7 = self._read(0x9A, 2, l)
-        self.dig_P8 = self._read(0x9C, 2, l)
-        self.dig_P9 = self._read(0x9E, 2, l)
-        self.dig_H1 = self._read(0xA1)
-        self.dig_H2 = self._read(0xE1, 2, l)
-        self.dig_H3 = self._read(0xE3)
-        E5 = self._read(0xE5)
-        self.dig_H4 = self._read(0xE4) << 4 | E5 & 0x0F
-        self.dig_H5 = (E5 >> 4) << 8 | self._read(0xE6)
-        self.dig_H6 = self._read(0xE7)
+        calib = bytearray(26)
+        self.read_burst(self.CALIB00, calib)
+        (
+            self.dig_T1,
+            self.dig_T2,
+            self.dig_T3,
+            self.dig_P1,
+            self.dig_P2,
+            self.dig_P3,
+            self.dig_P4,
+            self.dig_P5,
+            self.dig_P6,
+            self.dig_P7,
+            self.dig_P8,
+            self.dig_P9,
+        ) = struct.unpack_from("<HhhHhhhhhhhh", calib, 0)
+        self.dig_H1 = calib[25]
+        calib = bytearray(7)
+        self.read_burst(self.CALIB26, calib)
+        self.dig_H2, self.dig_H3, E4, E5, E6, self.dig_H6 = struct.unpack_from("<hBbBbb", calib, 0)
+        # dig_H4 = 0xE4[11:4] / 0xE5[3:0], dig_H5 = 0xE6[11:4] / 0xE5[7:4] (signed 12 bit)
+        self.dig_H4 = E4 << 4 | E5 & 0x0F
+        self.dig_H5 = E6 << 4 | E5 >> 4
+        # Coefficients passed to the compensation formulas, with the constant
+        # shifts applied once here. One tuple per formula keeps the attribute
+        # lookups per measurement down to three.
+        self._calib_T = (self.dig_T1, self.dig_T1 << 1, self.dig_T2, self.dig_T3)
+        self._calib_H = (
+            self.dig_H1,
+            self.dig_H2,
+            self.dig_H3,
+            self.dig_H4 << 20,
+            self.dig_H5,
+            self.dig_H6,
+        )
+        self._calib_P = (
+            self.dig_P1,
+            self.dig_P2,
+            self.dig_P3,
+            self.dig_P4 << 35,
+            self.dig_P5,
+            self.dig_P6,
+            self.dig_P7 << 4,
+            self.dig_P8,
+            self.dig_P9,
+        )
 
     # Start measurement
     # @return None
     def start_measure(self):
-        regval = self._read(0xF4)
-        self._write(0xF4, regval | 0x01)
+        regval = self.read_u8(self.CTRL_MEAS)
+        self.write_u8(self.CTRL_MEAS, regval | 0x01)
+
+    # Read and compensate the measurement values of a completed measurement
+    # @return temperature[raw], temperature[0.01 °C], humidity[raw], humidity[Q22.10 %RH],
+    #   pressure[raw], pressure[Q24.8 Pa]
+    #   humidity and pressure are None if they can not be compensated
+    def _get_compensated_results(self):
+        # Read press_msb..hum_lsb (0xF7..0xFE) in a single burst
+        buf = self._buf
+        self.i2c.readfrom_mem_into(self.i2c_addr, self.PRESS, buf)
+        p_raw = (buf[0] << 12) | (buf[1] << 4) | (buf[2] >> 4)
+        t_raw = (buf[3] << 12) | (buf[4] << 4) | (buf[5] >> 4)
+        h_raw = (buf[6] << 8) | buf[7]
+        #
+        t_fine = _comp_T(t_raw, self._calib_T)
+        t_int = (t_fine * 5 + 128) >> 8
+        h_int = _comp_H(h_raw, t_fine, self._calib_H)
+        p_int = _comp_P(p_raw, t_fine, self._calib_P)
+        return t_raw, t_int, h_raw, h_int, p_raw, p_int
 
     # Get the measurement values
     # @details
@@ -86,57 +186,34 @@ class BME280:
     #   and needs to be restarted again for a new measurement.
     # @return temperature[raw], temperature[°C], humidity[raw], humidity[%RH], pressure[raw], pressure[hPa]
     def get_measure_results(self):
-        status = self._read(0xF3)
-        if status != 0x00:
-            return None, None, None, None, None, None
-        else:
-            t_raw = self._read(0xFA, 3) >> 4
-            var1 = (((t_raw >> 3) - (self.dig_T1 << 1)) * self.dig_T2) >> 11
-            # var2 = (((((t_raw >> 4) - self.dig_T1) * ((t_raw >> 4) - self.dig_T1)) >> 12) * self.dig_T3) >> 14
-            var2 = (((((t_raw >> 4) - self.dig_T1) ** 2) >> 12) * self.dig_T3) >> 14
-            t_fine = var1 + var2
-            t_int = (t_fine * 5 + 128) >> 8
-            t_float = round(t_int / 100, 2)
-            #
-            h_raw = self._read(0xFD, 2)
-            var1 = t_fine - 76800
-            var1 = (
-                (((h_raw << 14) - (self.dig_H4 << 20) - (self.dig_H5 * var1)) + 16384) >> 15
-            ) * (
-                (
-                    (
-                        (
-                            (((var1 * self.dig_H6) >> 10) * (((var1 * self.dig_H3) >> 11) + 32768))
-                            >> 10
-                        )
-                        + 2097152
-                    )
-                    * self.dig_H2
-                    + 8192
-                )
-                >> 14
-            )
-            # var1 = (var1 - (((((var1 >> 15) * (var1 >> 15)) >> 7) * self.dig_H1) >> 4))
-            var1 = var1 - (((((var1 >> 15) ** 2) >> 7) * self.dig_H1) >> 4)
-            if var1 < 0 or var1 > 419430400:
-                h_float = None
-            else:
-                h_int = var1 >> 12
-                h_float = round(h_int / 1024, 2)
-            #
-            p_raw = self._read(0xF7, 3) >> 4
-            p_float = None
-            var1 = t_fine - 128000
-            var2 = var1 * var1 * self.dig_P6
-            var2 = var2 + ((var1 * self.dig_P5) << 17)
-            var2 = var2 + (self.dig_P4 << 35)
-            var1 = ((var1 * var1 * self.dig_P3) >> 8) + ((var1 * self.dig_P2) << 12)
-            var1 = ((1 << 47) + var1) * self.dig_P1 >> 33
-            if var1 != 0:
-                p_int = 1048576 - p_raw
-                p_int = (((p_int << 31) - var2) * 3125) // var1
-                var1 = (self.dig_P9 * (p_int >> 13) * (p_int >> 13)) >> 25
-                var2 = (self.dig_P8 * p_int) >> 19
-                p_int = ((p_int + var1 + var2) >> 8) + (self.dig_P7 << 4)
-                p_float = round(p_int / 25600, 2)
-            return t_raw, t_float, h_raw, h_float, p_raw, p_float
+        # polled: read the status without the RegBank call frame
+        buf = self._b1
+        self.i2c.readfrom_mem_into(self.i2c_addr, self.STATUS, buf)
+        if buf[0]:
+            # measurement still running
+            return _NONE_TUPLE
+        t_raw, t_int, h_raw, h_int, p_raw, p_int = self._get_compensated_results()
+        t_float = round(t_int * _INV100, 2)
+        h_float = None
+        if h_int is not None:
+            h_float = round(h_int * _INV1024, 2)
+        p_float = None
+        if p_int is not None:
+            p_float = round(p_int * _INV25600, 2)
+        return t_raw, t_float, h_raw, h_float, p_raw, p_float
+
+    # Get the measurement values as integers
+    # @return temperature[raw], temperature[0.01 °C], humidity[raw], humidity[0.01 %RH], pressure[raw], pressure[Pa]
+    def get_measure_results_int(self):
+        # polled: read the status without the RegBank call frame
+        buf = self._b1
+        self.i2c.readfrom_mem_into(self.i2c_addr, self.STATUS, buf)
+        if buf[0]:
+            # measurement still running
+            return _NONE_TUPLE
+        t_raw, t_int, h_raw, h_int, p_raw, p_int = self._get_compensated_results()
+        if h_int is not None:
+            h_int = (h_int * 100 + 512) >> 10
+        if p_int is not None:
+            p_int = (p_int + 128) >> 8
+        return t_raw, t_int, h_raw, h_int, p_raw, p_int
@@ -1,3 +1,4 @@
-metadata(description="BME280 temperature/humidity/pressure sensor driver.", version="0.1.0")
+metadata(description="BME280 temperature/humidity/pressure sensor driver.", version="0.2.1")
 
+require("regbank")
 module("bme280.py", opt=3)
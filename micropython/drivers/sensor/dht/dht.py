@@ -20,11 +20,12 @@ class DHTBase:
     def __init__(self, pin):
         self.pin = pin
         self.buf = bytearray(5)
+        self._mv = memoryview(self.buf)[:4]
 
     def measure(self):
         buf = self.buf
         dht_readinto(self.pin, buf)
-        if (buf[0] + buf[1] + buf[2] + buf[3]) & 0xFF != buf[4]:
+        if sum(self._mv) & 0xFF != buf[4]:
             raise Exception("checksum error")
 
 
@@ -55,25 +56,61 @@ class DHT:
         self.dht = dht
         self.pin = pin
         self.buf = bytearray(5)
+        self._mv = memoryview(self.buf)[:4]
 
-    def get_measure_results(self):
+    # Read the raw measurement values
+    # @return temperature[raw, magnitude], humidity[raw], temperature sign bit, valid
+    def _get_raw_results(self):
         buf = self.buf
         dht_readinto(self.pin, buf)
-        h_bytes = buf[0:2]
-        h_raw = int.from_bytes(h_bytes, "little")
-        t_bytes = buf[2:4]
-        t_raw = int.from_bytes(t_bytes, "little")
+        # Both values are transmitted big-endian, the temperature as sign/magnitude
+        h_raw = (buf[0] << 8) | buf[1]
+        t_raw = ((buf[2] & 0x7F) << 8) | buf[3]
+        sign = buf[2] & 0x80
+        valid = sum(self._mv) & 0xFF == buf[4]
+        return t_raw, h_raw, sign, valid
+
+    def get_measure_results(self):
+        t_raw, h_raw, sign, valid = self._get_raw_results()
         if self.dht == self.DHT11:
-            h_val = h_raw
-            t_val = t_raw & 0x7FFF
+            # integral bytes, the decimal bytes are zero
+            h_val = h_raw >> 8
+            t_val = t_raw >> 8
+            if sign:
+                t_raw = -t_raw
+                t_val = -t_val
         elif self.dht == self.DHT22:
-            h_val = h_raw / 10
-            t_val = (t_raw & 0x7FFF) / 10
-            if t_raw & 8000:
-                t_raw = -(t_raw & 0x7FFF)
+            h_val = h_raw * 0.1
+            t_val = t_raw * 0.1
+            if sign:
+                t_raw = -t_raw
                 t_val = -t_val
         else:
             h_val = None
             t_val = None
-        checksum = (buf[0] + buf[1] + buf[2] + buf[3]) & 0xFF
-        return t_raw, round(t_val, 2), h_raw, round(h_val, 2), bool(checksum == buf[4])
+        return t_raw, round(t_val, 2), h_raw, round(h_val, 2), valid
+
+    # Get the measurement values as integers
+    # @details
+    #   DHT11 only reports whole °C / %RH, so its values are multiples of 100.
+    # @return temperature[raw], temperature[0.01 °C], humidity[raw], humidity[0.01 %RH], valid
+    def get_measure_results_int(self):
+        t_raw, h_raw, sign, valid = self._get_raw_results()
+        if self.dht == self.DHT11:
+            # integral bytes, the decimal bytes are zero
+            h_centi = (h_raw >> 8) * 100
+            t_centi = (t_raw >> 8) * 100
+            if sign:
+                t_raw = -t_raw
+                t_centi = -t_centi
+        elif self.dht == self.DHT22:
+            # DHT22 values are in tenths
+            h_centi = h_raw * 10
+            t_centi = t_raw * 10
+            if sign:
+                t_raw = -t_raw
+                t_centi = -t_centi
+        else:
+            h_centi = None
+            t_centi = None
+        return t_raw, t_centi, h_raw, h_centi, valid
@@ -1,3 +1,4 @@
-metadata(description="TSL2591 ambient light sensor driver.", version="0.1.0")
+metadata(description="TSL2591 ambient light sensor driver.", version="0.1.2")
 
+require("regbank")
 module("tsl2591.py", opt=3)
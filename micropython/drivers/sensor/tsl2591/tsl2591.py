@@ -21,9 +21,18 @@
 #
 
 from machine import I2C
+from micropython import const
+from regbank import RegBank
 
+# Command bytes (CMD | normal operation | register address)
+_CMD = const(0xA0)
+# Prebuilt command bytes for the registers accessed while polling
+_CMD_ENABLE = const(_CMD | 0x00)  # TSL2591.ENABLE
+_CMD_STATUS = const(_CMD | 0x13)  # TSL2591.STATUS
+_CMD_C0DATA = const(_CMD | 0x14)  # TSL2591.C0DATA
 
-class TSL2591:
+
+class TSL2591(RegBank):
     # Register
     ENABLE = 0x00
     CONFIG = 0x01
@@ -32,26 +41,20 @@ class TSL2591:
     C1DATA = 0x16
 
     def __init__(self, i2c, addr=0x29):
-        self.i2c = i2c
-        self.i2c_addr = addr
+        super().__init__(i2c, addr)
+        # Receive buffer for C0DATA..C1DATA
+        self._buf4 = bytearray(4)
         # PowerOn
         self._write(self.ENABLE, 0x01)
 
-    # Read data from register
-    # @param addr register address
-    # @param len  number of bytes (default: 1)
-    # @return register value as int
-    def _read(self, addr, len=1):
-        cmd = (0xA0 | addr) & 0xFF
-        bytes = self.i2c.readfrom_mem(self.i2c_addr, cmd, len)
-        return int.from_bytes(bytes, "little")
-
     # Write data into register
     # @param addr register address
     # @param data register value
     def _write(self, addr, data):
-        cmd = (0xA0 | addr) & 0xFF
-        self.i2c.writeto_mem(self.i2c_addr, cmd, bytes([int(data)]))
+        self.write_u8(_CMD | addr, data)
+        if addr == self.ENABLE:
+            # shadow copy, the ENABLE register is only changed by this driver
+            self._enable = data
 
     # Start measurement
     # @param time 100..600, step 100 (time in ms)
@@ -64,9 +67,8 @@ class TSL2591:
             atime = (time // 100) - 1
         again = (gain & 0x3) << 4
         self._write(self.CONFIG, (atime | again))
-        # enable ALS (AEN)
-        enable = self._read(0x00)
-        self._write(self.ENABLE, (enable | 0x02))
+        # enable ALS (AEN), PON is always set
+        self._write(self.ENABLE, 0x03)
 
     # Get the measurement value
     # @details
@@ -76,14 +78,25 @@ class TSL2591:
     #   the measurement has to be start again
     # @return ch0 (full), ch1 (ir)
     def get_measure_results(self):
-        if self._read(self.ENABLE) & 0x02:
+        # The register accesses are inlined, this is called repeatedly while polling
+        enable = self._enable
+        if enable & 0x02:
             # started
-            if self._read(self.STATUS) & 0x01:
-                full_raw = self._read(self.C0DATA, 2)
-                ir_raw = self._read(self.C1DATA, 2)
+            i2c = self.i2c
+            buf = self._b1
+            i2c.readfrom_mem_into(self.i2c_addr, _CMD_STATUS, buf)
+            if buf[0] & 0x01:
+                # read C0DATAL..C1DATAH in one burst
+                buf = self._buf4
+                i2c.readfrom_mem_into(self.i2c_addr, _CMD_C0DATA, buf)
+                full_raw = buf[0] | (buf[1] << 8)
+                ir_raw = buf[2] | (buf[3] << 8)
                 # disable ALS (AEN)
-                enable = self._read(self.ENABLE)
-                self._write(self.ENABLE, (enable & 0xFD))
+                enable &= 0xFD
+                buf = self._b1
+                buf[0] = enable
+                i2c.writeto_mem(self.i2c_addr, _CMD_ENABLE, buf)
+                self._enable = enable
                 return full_raw, ir_raw
             else:
                 return None, None